@@ -1,89 +1,188 @@
 import asyncio
-import json
-import time
+import functools
+import logging
 
 from aioquic.asyncio import connect, serve
 from aioquic.quic.configuration import QuicConfiguration
 from aioquic.quic.events import StreamDataReceived, DatagramFrameReceived
-from aioquic.asyncio.protocol import QuicConnectionProtocol
 
-from GameServerProtocol import GameServerProtocol
+from GameServerProtocol import (
+    HEADER,
+    MAX_RETRANSMISSIONS,
+    RETRANSMISSION_TIMEOUT,
+    CoalescingProtocol,
+    GameServerProtocol,
+    SendBuffer,
+    dumps,
+    now_ms,
+    parse_packet,
+    split_frames,
+)
+
+logger = logging.getLogger(__name__)
 
 RELIABLE = 1
 UNRELIABLE = 0
 
-RETRANSMISSION_TIMEOUT = 0.2  # 200 ms default
-TIMESTAMP_BYTES = 8
+# Largest packet sent as a DATAGRAM frame. A frame must fit in one QUIC packet
+# (aioquic's default max_datagram_size is 1200 bytes) after the packet header,
+# AEAD tag and frame header; larger ones would block the datagram queue.
+MAX_DATAGRAM_PACKET = 1100
+
+
+def run(coro):
+    """Run coro to completion on uvloop when it is installed.
+
+    On Python 3.11+ the loop factory is passed to asyncio.Runner, so the
+    global event loop policy is left untouched; older versions install
+    uvloop's policy and use asyncio.run().
+    """
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None  # uvloop is unavailable on Windows, use asyncio's loop
+    if hasattr(asyncio, "Runner"):
+        loop_factory = uvloop.new_event_loop if uvloop else None
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            return runner.run(coro)
+    if uvloop:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
 
-class GameClientProtocol(QuicConnectionProtocol):
+
+class GameClientProtocol(CoalescingProtocol):
     """Custom protocol for client to receive messages from server"""
-    
-    def __init__(self, *args, on_message=None, **kwargs):
+
+    __slots__ = (
+        "_on_reliable",
+        "_on_unreliable",
+        "seq",
+        "_unacked",
+        "_stream_rx",
+        "_send_buf",
+        "_send_stream_id",
+        "_create_task",
+    )
+
+    def __init__(self, *args, on_reliable=None, on_unreliable=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.on_message = on_message
-        self.seq = {RELIABLE: 0, UNRELIABLE: 0}
+        # callbacks with the reliable flag already bound, None if unset
+        self._on_reliable = on_reliable
+        self._on_unreliable = on_unreliable
+        self.seq = [0, 0]  # next seq_no, indexed by channel
+        self._unacked = {}  # reliable seq_no -> retransmission TimerHandle
+        self._stream_rx = {}  # stream_id -> bytes not yet framed
+        self._send_buf = SendBuffer()
+        self._send_stream_id = None  # long-lived stream for oversized reliable sends
+        self._create_task = self._loop.create_task  # bound once, used per packet
 
     def quic_event_received(self, event):
         """Handle incoming QUIC events (messages from server)"""
         if isinstance(event, StreamDataReceived):
-            asyncio.create_task(self._handle_stream_data(event))
+            buffer = self._stream_rx.setdefault(event.stream_id, bytearray())
+            buffer += event.data
+            frames = split_frames(buffer)
+            if event.end_stream:
+                self._stream_rx.pop(event.stream_id, None)
+            # the server's reliable stream also carries ACKs for our sends
+            if self._on_reliable is not None or self._unacked:
+                for frame in frames:
+                    self._handle(frame, self._on_reliable)
         elif isinstance(event, DatagramFrameReceived):
-            asyncio.create_task(self._handle_datagram(event))
+            if self._on_unreliable is not None:
+                self._handle(event.data, self._on_unreliable)
 
-    async def _handle_stream_data(self, event):
-        """Handle reliable stream data from server"""
+    def _handle(self, data: bytes, callback):
+        """Parse a packet from server and schedule its pre-bound callback"""
         try:
-            header_len = 1 + 2 + TIMESTAMP_BYTES
-            if len(event.data) < header_len:
-                return
-            
-            payload_bytes = event.data[header_len:]
-            payload = json.loads(payload_bytes.decode())
-            
-            if self.on_message:
-                await self.on_message(payload, reliable=True)
+            parsed = parse_packet(data)
         except Exception as e:
-            print(f"[CLIENT] Error handling stream data: {e}")
+            logger.warning("[CLIENT] Error handling packet: %s", e)
+            return
+        if parsed is None:
+            return
 
-    async def _handle_datagram(self, event):
-        """Handle unreliable datagram from server"""
-        try:
-            header_len = 1 + 2 + TIMESTAMP_BYTES
-            if len(event.data) < header_len:
-                return
-            
-            payload_bytes = event.data[header_len:]
-            payload = json.loads(payload_bytes.decode())
-            
-            if self.on_message:
-                await self.on_message(payload, reliable=False)
-        except Exception as e:
-            print(f"[CLIENT] Error handling datagram: {e}")
+        channel, _, _, payload = parsed
+        if channel == RELIABLE and isinstance(payload, dict):
+            # {"ack": "received", "seq_echo": N} from the receiver
+            handle = self._unacked.pop(payload.get("seq_echo"), None)
+            if handle is not None:
+                handle.cancel()
+        if callback is not None:
+            self._create_task(callback(payload))
 
-    async def send_packet(self, data: dict, reliable: bool = True):
+    def send_packet(self, data: dict, reliable: bool = True):
         """Send a packet to the server with proper seq and timestamp"""
         channel = RELIABLE if reliable else UNRELIABLE
         seq_no = self.seq[channel]
-        timestamp = int(time.time() * 1000)
-        
-        payload = json.dumps(data)
-        header = (
-            channel.to_bytes(1, "big")
-            + seq_no.to_bytes(2, "big")
-            + timestamp.to_bytes(TIMESTAMP_BYTES, "big")
-        )
-        packet = header + payload.encode()
+        timestamp = now_ms()
 
-        if reliable:
-            stream_id = self._quic.get_next_available_stream_id()
-            self._quic.send_stream_data(stream_id, packet, end_stream=True)
-            print(f"[RELIABLE] Sent Seq {seq_no}: {payload}")
+        payload = dumps(data)
+        size = HEADER.size + len(payload)
+        if size > MAX_DATAGRAM_PACKET:
+            if not reliable:
+                raise ValueError(
+                    f"Unreliable packet of {size} bytes exceeds the "
+                    f"{MAX_DATAGRAM_PACKET} byte datagram limit"
+                )
+            # too big for one DATAGRAM frame, the stream retransmits by itself
+            self._send_on_stream(seq_no, timestamp, payload)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[RELIABLE] Sent Seq %d on stream: %s", seq_no, data)
         else:
+            packet = self._send_buf.pack(channel, seq_no, timestamp, payload)
+
+            # both channels use DATAGRAM frames, reliable ones are retransmitted
+            # until the receiver's ACK for their seq_no comes back
             self._quic.send_datagram_frame(packet)
-            print(f"[UNRELIABLE] Sent Seq {seq_no}: {payload}")
+            if reliable:
+                self._unacked[seq_no] = self._loop.call_later(
+                    RETRANSMISSION_TIMEOUT, self._retransmit, seq_no, packet, 1
+                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("[RELIABLE] Sent Seq %d: %s", seq_no, data)
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[UNRELIABLE] Sent Seq %d: %s", seq_no, data)
+
+        self.seq[channel] = (seq_no + 1) % 65536
+        self._schedule_flush()
+
+    def _send_on_stream(self, seq_no: int, timestamp: int, payload: bytes):
+        """Send a length-prefixed reliable packet on one long-lived stream"""
+        packet = self._send_buf.pack(RELIABLE, seq_no, timestamp, payload, framed=True)
+        if self._send_stream_id is None:
+            self._send_stream_id = self._quic.get_next_available_stream_id()
+        self._quic.send_stream_data(self._send_stream_id, packet)
+
+    def _retransmit(self, seq_no: int, packet: bytes, attempt: int):
+        """Resend a reliable packet whose ACK has not arrived in time"""
+        if seq_no not in self._unacked:
+            return
+        if attempt > MAX_RETRANSMISSIONS:
+            del self._unacked[seq_no]
+            logger.warning("[RELIABLE] Seq %d unacknowledged, giving up", seq_no)
+            return
 
-        self.seq[channel] += 1
-        self.transmit()
+        self._quic.send_datagram_frame(packet)
+        self._schedule_flush()
+        self._unacked[seq_no] = self._loop.call_later(
+            RETRANSMISSION_TIMEOUT, self._retransmit, seq_no, packet, attempt + 1
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[RELIABLE] Retransmit %d of Seq %d", attempt, seq_no)
+
+    def end_stream(self):
+        """Finish the long-lived stream used for oversized reliable sends"""
+        if self._send_stream_id is not None:
+            self._quic.send_stream_data(self._send_stream_id, b"", end_stream=True)
+            self._send_stream_id = None
+            self._schedule_flush()
+
+    def cancel_retransmissions(self):
+        """Stop retransmitting reliable packets that are still unacknowledged"""
+        for handle in self._unacked.values():
+            handle.cancel()
+        self._unacked.clear()
 
 class GameNetAPI:
     def __init__(
@@ -101,6 +200,8 @@ class GameNetAPI:
         self.seq = {RELIABLE: 0, UNRELIABLE: 0}
         self.connected = False
         self.on_message = None  # callback for received messages
+        self._cb_reliable = None  # on_message bound to reliable=True
+        self._cb_unreliable = None  # on_message bound to reliable=False
         if not isClient:
             self.config.load_cert_chain(certfile=certfile, keyfile=keyfile)
         # enable datagram support
@@ -122,7 +223,10 @@ class GameNetAPI:
             self.port,
             configuration=self.config,
             create_protocol=lambda *args, **kwargs: GameClientProtocol(
-                *args, on_message=self.on_message, **kwargs
+                *args,
+                on_reliable=self._cb_reliable,
+                on_unreliable=self._cb_unreliable,
+                **kwargs,
             ),
         )
         self.conn = await self._connect_ctx.__aenter__()
@@ -133,12 +237,15 @@ class GameNetAPI:
         if not self.connected:
             raise RuntimeError("Not connected — call connect() first")
 
-        await self.conn.send_packet(data, reliable=reliable)
+        # send_packet is synchronous, kept async here for API compatibility
+        self.conn.send_packet(data, reliable=reliable)
 
     async def close(self):
         if not self.connected:
             return
         print("Closing QUIC connection...")
+        self.conn.cancel_retransmissions()
+        self.conn.end_stream()
         await self._connect_ctx.__aexit__(None, None, None)
         self.connected = False
         print("Connection closed")
@@ -146,9 +253,21 @@ class GameNetAPI:
     def set_message_callback(self, callback):
         """Set callback for received messages.
 
-        callback should be an async function taking (data: dict, reliable: bool)
+        callback should be an async function. Its signature depends on the mode:
+
+        - client: callback(data: dict, reliable: bool), data is the payload
+        - server: callback(data: dict, reliable: bool, proto, *, wire_bytes: int)
+          where data holds seq_no, timestamp, arrival_ns, rtt_ms and payload,
+          proto is the GameServerProtocol to reply on, and wire_bytes is the
+          size of the packet as received. wire_bytes is always passed, so a
+          server callback must accept it.
         """
         self.on_message = callback
+        if callback is None:
+            self._cb_reliable = self._cb_unreliable = None
+        else:
+            self._cb_reliable = functools.partial(callback, reliable=True)
+            self._cb_unreliable = functools.partial(callback, reliable=False)
 
     async def start_server(self):
         """Start the QUIC server and wait for connections"""
@@ -1,6 +1,9 @@
 import asyncio
-import json
-import time
+import heapq
+import logging
+import struct
+from collections import deque
+from time import time_ns
 
 from aioquic.asyncio.protocol import QuicConnectionProtocol
 from aioquic.quic.events import (
@@ -9,120 +12,361 @@ from aioquic.quic.events import (
     StreamDataReceived,
 )
 
+try:
+    import orjson
+
+    dumps = orjson.dumps  # returns bytes
+    loads = orjson.loads  # accepts bytes
+except ImportError:
+    import json
+
+    def dumps(data) -> bytes:
+        return json.dumps(data).encode()
+
+    loads = json.loads
+
+logger = logging.getLogger(__name__)
+
 RELIABLE = 1
 UNRELIABLE = 0
 
 RETRANSMISSION_TIMEOUT = 0.2  # 200 ms default
-TIMESTAMP_BYTES = 8
+MAX_RETRANSMISSIONS = 10  # give up on a reliable packet after this many resends
+REORDER_LIMIT = 256  # max reliable packets held back waiting for a gap
+# how long reliable packets wait behind a gap before it is skipped, just past
+# the point where the sender has given up retransmitting the missing packet
+GAP_TIMEOUT = (MAX_RETRANSMISSIONS + 2) * RETRANSMISSION_TIMEOUT
+
+# header: 1 byte channel | 2 bytes seq_no | 8 bytes timestamp
+HEADER = struct.Struct(">BHQ")
+# length prefix of each packet sent on the long-lived reliable stream, 4 bytes
+# so stream packets are not limited to 64 KiB
+FRAME_LENGTH = struct.Struct(">I")
+
+
+def now_ms() -> int:
+    """Current time in integer milliseconds, as carried in the header.
+
+    This stays on the wall clock rather than time.monotonic_ns(): the
+    timestamp is compared against the peer's clock, and monotonic clocks
+    are not comparable across hosts.
+    """
+    return time_ns() // 1_000_000
+
+
+def parse_packet(packet: bytes):
+    """Split a packet into (channel, seq_no, timestamp, payload).
+
+    Returns None if the packet is shorter than the header and raises
+    ValueError if the payload is not valid JSON.
+    """
+    if len(packet) < HEADER.size:
+        return None
+
+    channel, seq_no, timestamp = HEADER.unpack_from(packet, 0)
+    payload = loads(packet[HEADER.size :])
+    return channel, seq_no, timestamp, payload
 
 
-class GameServerProtocol(QuicConnectionProtocol):
+class SendBuffer:
+    """Reusable buffer that builds outgoing packets in place.
+
+    Room for the stream length prefix is kept in front of the header, so
+    framed and unframed packets come out of the same buffer with a single
+    copy into the returned bytes.
+    """
+
+    def __init__(self, size: int = 2048):
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+
+    def pack(self, channel, seq_no, timestamp, payload: bytes, framed=False):
+        """Return header + payload, length-prefixed if framed for a stream"""
+        start = FRAME_LENGTH.size
+        end = start + HEADER.size + len(payload)
+        if end > len(self._buf):
+            # oversized payload, grow once and keep the larger buffer
+            self._buf = bytearray(end)
+            self._view = memoryview(self._buf)
+        HEADER.pack_into(self._buf, start, channel, seq_no, timestamp)
+        self._buf[start + HEADER.size : end] = payload
+        if framed:
+            FRAME_LENGTH.pack_into(self._buf, 0, end - start)
+            start = 0
+        return bytes(self._view[start:end])
+
+
+def split_frames(buffer: bytearray):
+    """Remove and return every complete frame at the front of buffer.
+
+    A trailing partial frame stays in buffer until more stream data arrives.
+    """
+    frames = []
+    offset = 0
+    while len(buffer) - offset >= FRAME_LENGTH.size:
+        (length,) = FRAME_LENGTH.unpack_from(buffer, offset)
+        start = offset + FRAME_LENGTH.size
+        if len(buffer) < start + length:
+            break
+        frames.append(bytes(buffer[start : start + length]))
+        offset = start + length
+    del buffer[:offset]
+    return frames
+
+
+class CoalescingProtocol(QuicConnectionProtocol):
+    """QuicConnectionProtocol that defers transmit() to the end of the tick
+
+    Sends made in the same loop iteration call _schedule_flush() and go out
+    in a single transmit().
+    """
+
+    # per-packet state lives in slots rather than the instance __dict__
+    __slots__ = ("_flush_scheduled",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._flush_scheduled = False  # transmit() pending for this tick
+
+    def _schedule_flush(self):
+        """Coalesce sends made in the same loop iteration into one transmit()"""
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        self.transmit()
+
+
+class GameServerProtocol(CoalescingProtocol):
+    __slots__ = (
+        "_reliable_heap",
+        "_reliable_pending",
+        "_gap_timer",
+        "_gap_seq",
+        "expected_seq",
+        "next_ack_seq",
+        "_ack",
+        "on_message",
+        "_send_stream_id",
+        "_stream_rx",
+        "_send_buf",
+        "_inbox",
+        "_wake",
+        "_consumer",
+    )
+
     def __init__(self, *args, on_message=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.reliable_buffer = {}  # seq_no -> packet
-        self.expected_seq = 0  # next expected reliable seq
+        self._reliable_heap = []  # (seq, arrival, data)
+        self._reliable_pending = set()  # seqs currently in the heap
+        self._gap_timer = None  # TimerHandle that skips the gap at _gap_seq
+        self._gap_seq = None  # expected_seq the heap is waiting on
+        self.expected_seq = 0  # next expected reliable seq (not wrapped)
         self.next_ack_seq = 0  # seq for server -> client packets
+        self._ack = {"ack": "received", "seq_echo": 0}  # reused for every ACK
         self.on_message = on_message  # callback for received messages
+        self._send_stream_id = None  # long-lived stream for reliable sends
+        self._stream_rx = {}  # stream_id -> bytes not yet framed
+        self._send_buf = SendBuffer()
+        self._inbox = deque()  # (formatted_data, reliable, wire_bytes) to deliver
+        self._wake = asyncio.Event()  # set when the inbox gets new packets
+        self._consumer = None  # task draining the inbox, started on first packet
 
     def quic_event_received(self, event):
         if isinstance(event, StreamDataReceived):
-            # schedule async handler
-            asyncio.create_task(self._handle_packet(event.data, reliable=True))
+            buffer = self._stream_rx.setdefault(event.stream_id, bytearray())
+            buffer += event.data
+            for frame in split_frames(buffer):
+                self._handle_packet(frame)
             if event.end_stream:
-                # reset the stream if the peer closed it
-                try:
-                    self._quic.reset_stream(event.stream_id, 0)
-                except Exception:
-                    pass
+                # aioquic cleans up a stream once both sides have ended it
+                self._stream_rx.pop(event.stream_id, None)
 
         elif isinstance(event, DatagramFrameReceived):
-            asyncio.create_task(self._handle_packet(event.data, reliable=False))
+            self._handle_packet(event.data)
 
         elif isinstance(event, ConnectionTerminated):
-            print("Connection terminated by client")
+            logger.info("Connection terminated by client")
+            if self._gap_timer is not None:
+                self._gap_timer.cancel()
+                self._gap_timer = None
+            if self._consumer is not None:
+                # let the consumer deliver what is queued, then exit
+                self._inbox.append(None)
+                self._wake.set()
 
-    async def _handle_packet(self, packet: bytes, reliable: bool):
-        # header: 1 byte channel | 2 bytes seq_no | 8 bytes timestamp
-        header_len = 1 + 2 + TIMESTAMP_BYTES
-        if len(packet) < header_len:
-            print("Malformed packet received")
+    def _handle_packet(self, packet: bytes):
+        # parse synchronously, only delivery to the application is scheduled.
+        # The channel byte, not the transport, decides reliability: reliable
+        # packets arrive as retransmitted datagrams or on a stream
+        try:
+            parsed = parse_packet(packet)
+        except ValueError:
+            logger.warning("Failed to decode JSON: %r", packet[HEADER.size :])
+            return
+        if parsed is None:
+            logger.warning("Malformed packet received")
             return
 
-        channel = packet[0]
-        seq_no = int.from_bytes(packet[1:3], "big")
-        timestamp = int.from_bytes(packet[3 : 3 + TIMESTAMP_BYTES], "big")
-        payload_bytes = packet[3 + TIMESTAMP_BYTES :]
+        channel, seq_no, timestamp, data = parsed
+        reliable = channel == RELIABLE
+        if reliable:
+            # ACK on receipt rather than after in-order delivery, so packets
+            # held behind a gap are not retransmitted. Duplicates are ACKed
+            # too, in case the ACK for the first copy was lost
+            self._ack["seq_echo"] = seq_no
+            self.send_packet(self._ack)
 
-        try:
-            data = json.loads(payload_bytes.decode())
-        except Exception:
-            print("Failed to decode JSON:", payload_bytes)
-            return
+            # unwrap seq_no so the heap order survives the 16-bit wrap-around
+            offset = (seq_no - self.expected_seq) % 65536
+            seq = self.expected_seq + offset
+            if offset >= 32768 or seq in self._reliable_pending:
+                # retransmission of a packet already delivered or buffered
+                return
 
+        # read the clock once per packet, RTT is computed here and reused by
+        # both delivery and the application
+        arrival_ns = time_ns()
+        rtt_ms = arrival_ns / 1_000_000 - timestamp
+        arrival = (timestamp, arrival_ns, rtt_ms, len(packet))
         if reliable:
             # buffer and reorder
-            self.reliable_buffer[seq_no] = (data, timestamp)
-            await self._deliver_reliable()
+            self._reliable_pending.add(seq)
+            heapq.heappush(self._reliable_heap, (seq, arrival, data))
+            if len(self._reliable_heap) > REORDER_LIMIT:
+                # give up on the missing packets instead of buffering forever
+                logger.warning(
+                    "Reliable gap at Seq %d, skipping", self.expected_seq % 65536
+                )
+                self.expected_seq = self._reliable_heap[0][0]
+            self._deliver_reliable()
         else:
             # deliver immediately
-            await self._deliver_packet(
-                data, reliable=False, seq_no=seq_no, timestamp=timestamp
-            )
+            self._deliver_packet(data, reliable=False, seq_no=seq_no, arrival=arrival)
 
-    async def _deliver_reliable(self):
+    def _deliver_reliable(self):
         # deliver all in-order packets
-        while self.expected_seq in self.reliable_buffer:
-            data, ts = self.reliable_buffer.pop(self.expected_seq)
-            await self._deliver_packet(
-                data, reliable=True, seq_no=self.expected_seq, timestamp=ts
+        heap = self._reliable_heap
+        while heap and heap[0][0] == self.expected_seq:
+            seq, arrival, data = heapq.heappop(heap)
+            self._reliable_pending.discard(seq)
+            self.expected_seq = seq + 1
+            self._deliver_packet(
+                data, reliable=True, seq_no=seq % 65536, arrival=arrival
             )
-            self.expected_seq += 1
+        self._update_gap_timer()
 
-    async def _deliver_packet(self, data, reliable, seq_no, timestamp):
+    def _update_gap_timer(self):
+        """Time how long buffered packets have waited on the current gap"""
+        if not self._reliable_heap:
+            if self._gap_timer is not None:
+                self._gap_timer.cancel()
+                self._gap_timer = None
+            return
+        if self._gap_timer is not None and self._gap_seq == self.expected_seq:
+            return  # still waiting on the same missing packet
+        if self._gap_timer is not None:
+            self._gap_timer.cancel()
+        self._gap_seq = self.expected_seq
+        self._gap_timer = self._loop.call_later(GAP_TIMEOUT, self._skip_gap)
+
+    def _skip_gap(self):
+        """Give up on a missing packet the sender has stopped retransmitting"""
+        self._gap_timer = None
+        if not self._reliable_heap or self._gap_seq != self.expected_seq:
+            return
+        logger.warning(
+            "Reliable gap at Seq %d timed out, skipping", self.expected_seq % 65536
+        )
+        self.expected_seq = self._reliable_heap[0][0]
+        self._deliver_reliable()
+
+    def _deliver_packet(self, data, reliable, seq_no, arrival):
         """Deliver packet to application callback
 
-        Formats the data as expected by ReceiverApplication:
+        Everything up to here runs synchronously inside quic_event_received.
+        The packet is queued on the inbox and a single consumer task awaits
+        the async callback, draining every packet that is ready per wakeup.
+
+        arrival is the (timestamp, arrival_ns, rtt_ms, wire_bytes) tuple
+        captured when the packet was received. wire_bytes, the size of the
+        packet as received, is passed to the callback as a keyword so it
+        does not have to re-serialize the payload to count bytes. Formats
+        the data as expected by ReceiverApplication:
         {
             'seq_no': int,
-            'timestamp': float (in ms),
+            'timestamp': int (in ms),
+            'arrival_ns': int (receiver clock, in ns),
+            'rtt_ms': float,
             'payload': dict (original data)
         }
         """
-        rtt = int(time.time() * 1000) - timestamp
-        print(
-            f"{'[RELIABLE]' if reliable else '[UNRELIABLE]'} "
-            f"Seq {seq_no} | Timestamp {timestamp} | RTT {rtt} ms | Data: {data}"
-        )
+        timestamp, arrival_ns, rtt_ms, wire_bytes = arrival
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s Seq %d | Timestamp %d | RTT %.2f ms | Data: %s",
+                "[RELIABLE]" if reliable else "[UNRELIABLE]",
+                seq_no,
+                timestamp,
+                rtt_ms,
+                data,
+            )
 
         if self.on_message:
             # Format data as expected by ReceiverApplication
             formatted_data = {
                 "seq_no": seq_no,
                 "timestamp": timestamp,  # Original timestamp from sender
+                "arrival_ns": arrival_ns,
+                "rtt_ms": rtt_ms,
                 "payload": data,  # Original data payload
             }
-            try:
-                await self.on_message(formatted_data, reliable, self)
-            except Exception as e:
-                print(f"Error in message callback: {e}")
+            self._inbox.append((formatted_data, reliable, wire_bytes))
+            if self._consumer is None:
+                self._consumer = self._loop.create_task(self._consume())
+            self._wake.set()
+
+    async def _consume(self):
+        """Deliver queued packets to on_message, in arrival order"""
+        inbox = self._inbox
+        while True:
+            await self._wake.wait()
+            # clear before draining, packets queued meanwhile set it again
+            self._wake.clear()
+            while inbox:
+                item = inbox.popleft()
+                if item is None:
+                    return
+                data, reliable, wire_bytes = item
+                try:
+                    await self.on_message(data, reliable, self, wire_bytes=wire_bytes)
+                except Exception as e:
+                    logger.error("Error in message callback: %s", e)
 
-    async def send_packet(self, data: dict, reliable: bool = True):
+    def send_packet(self, data: dict, reliable: bool = True):
         """Send a packet to the client with proper seq and timestamp."""
-        channel_byte = (0 if not reliable else 1).to_bytes(1, "big")
+        channel = RELIABLE if reliable else UNRELIABLE
         seq_no = self.next_ack_seq if reliable else 0
-        seq_bytes = seq_no.to_bytes(2, "big")
-        timestamp = int(time.time() * 1000)
-        ts_bytes = timestamp.to_bytes(TIMESTAMP_BYTES, "big")
-        payload_bytes = json.dumps(data).encode()
-        packet = channel_byte + seq_bytes + ts_bytes + payload_bytes
+        timestamp = now_ms()
+        payload_bytes = dumps(data)
+        packet = self._send_buf.pack(
+            channel, seq_no, timestamp, payload_bytes, framed=reliable
+        )
 
         if reliable:
-            # send over a new QUIC stream for guaranteed delivery
-            stream_id = self._quic.get_next_available_stream_id()
-            self._quic.send_stream_data(stream_id, packet, end_stream=True)
+            # send over one long-lived QUIC stream for guaranteed, in-order
+            # delivery
+            if self._send_stream_id is None:
+                self._send_stream_id = self._quic.get_next_available_stream_id()
+            self._quic.send_stream_data(self._send_stream_id, packet)
             self.next_ack_seq = (self.next_ack_seq + 1) % 65536
         else:
             self._quic.send_datagram_frame(packet)
 
-        self.transmit()
-        print(f"[SERVER-SEND] Seq {seq_no} | Reliable={reliable} | Data: {data}")
\ No newline at end of file
+        self._schedule_flush()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[SERVER-SEND] Seq %d | Reliable=%s | Data: %s", seq_no, reliable, data
+            )
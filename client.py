@@ -1,30 +1,67 @@
 import asyncio
 import random
-from GameNetAPI import GameNetAPI
+
+import numpy as np
+
+from GameNetAPI import GameNetAPI, run
+
+DIRECTIONS = [0, 90, 180, 270]
+LOCATIONS = ["forest", "desert", "city", "mountain", "beach"]
+
+
+class GameDataGenerator:
+    """Pre-generates random game data in batches with NumPy."""
+
+    def __init__(self, batch_size=1024):
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng()
+        self._refill()
+
+    def _refill(self):
+        """Draw a whole batch of fields at once, converted to Python types"""
+        n = self.batch_size
+        self.player_ids = self.rng.integers(1, 11, size=n).tolist()
+        self.positions = self.rng.uniform(0, 500, size=(n, 2)).tolist()
+        self.directions = self.rng.choice(DIRECTIONS, size=n).tolist()
+        self.locations = self.rng.choice(LOCATIONS, size=n).tolist()
+        self.index = 0
+
+    def next(self):
+        """Return the next pre-generated game data packet."""
+        if self.index == self.batch_size:
+            self._refill()
+        i = self.index
+        self.index += 1
+        pos_x, pos_y = self.positions[i]
+        return {
+            "player_id": self.player_ids[i],
+            "pos_x": pos_x,
+            "pos_y": pos_y,
+            "dir": self.directions[i],
+            "location": self.locations[i],
+        }
+
+
+_generator = GameDataGenerator()
+
 
 def generate_game_data():
     """Generate random game data packet for testing."""
-    player_id = random.randint(1, 10)
-    pos_x = random.uniform(0, 500)
-    pos_y = random.uniform(0, 500)
-    direction = random.choice([0, 90, 180, 270])
-    location = random.choice(["forest", "desert", "city", "mountain", "beach"])
-    return {
-        "player_id": player_id,
-        "pos_x": pos_x,
-        "pos_y": pos_y,
-        "dir": direction,
-        "location": location
-    }
-
-async def send_data(api):
-    """Send 100 game data packets to the server."""
-    for i in range(100):
-        # add reliable or unreliable tag randomly
-        reliable = random.choice([True, False])
-        data = generate_game_data()
-        await api.send(data, reliable=reliable)
-        await asyncio.sleep(0.05)
+    return _generator.next()
+
+async def send_data(api, total=100, per_tick=4, tick=0.05):
+    """Send game data packets to the server in bursts of per_tick every tick.
+
+    Packets queued in the same tick are flushed together, so each burst
+    shares a single transmit() instead of one per packet.
+    """
+    for i in range(0, total, per_tick):
+        for _ in range(min(per_tick, total - i)):
+            # add reliable or unreliable tag randomly
+            reliable = random.choice([True, False])
+            data = generate_game_data()
+            await api.send(data, reliable=reliable)
+        await asyncio.sleep(tick)
 
 async def main():
     api = GameNetAPI()
@@ -43,4 +80,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
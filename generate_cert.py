@@ -5,7 +5,7 @@ Used by both client and server
 """
 
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 
 def generate_self_signed_cert(certfile="cert.pem", keyfile="key.pem", force=False):
@@ -38,17 +38,15 @@ def generate_self_signed_cert(certfile="cert.pem", keyfile="key.pem", force=Fals
     try:
         from cryptography import x509
         from cryptography.x509.oid import NameOID
-        from cryptography.hazmat.primitives import hashes
-        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.hazmat.primitives.asymmetric import ed25519
         from cryptography.hazmat.primitives import serialization
         import ipaddress  # ← Fix: Import ipaddress module
         
-        # Generate private key
-        print("   📝 Generating RSA private key (2048 bits)...")
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=2048,
-        )
+        # Generate private key (Ed25519 is far quicker to generate than RSA
+        # and gives a smaller certificate for the TLS handshake)
+        print("   📝 Generating Ed25519 private key...")
+        private_key = ed25519.Ed25519PrivateKey.generate()
+        now = datetime.now(timezone.utc)
         
         # Create certificate subject
         subject = issuer = x509.Name([
@@ -71,10 +69,10 @@ def generate_self_signed_cert(certfile="cert.pem", keyfile="key.pem", force=Fals
         ).serial_number(
             x509.random_serial_number()
         ).not_valid_before(
-            datetime.utcnow()
+            now
         ).not_valid_after(
             # Valid for 365 days
-            datetime.utcnow() + timedelta(days=365)
+            now + timedelta(days=365)
         ).add_extension(
             # Add Subject Alternative Names for localhost
             x509.SubjectAlternativeName([
@@ -83,14 +81,14 @@ def generate_self_signed_cert(certfile="cert.pem", keyfile="key.pem", force=Fals
                 x509.IPAddress(ipaddress.IPv4Address("127.0.0.1")),  # ← Fix: Use ipaddress module
             ]),
             critical=False,
-        ).sign(private_key, hashes.SHA256())
+        ).sign(private_key, None)  # Ed25519 has a fixed hash
         
         # Write private key to file
         print(f"   💾 Writing private key to {keyfile}...")
         with open(keyfile, "wb") as f:
             f.write(private_key.private_bytes(
                 encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.TraditionalOpenSSL,
+                format=serialization.PrivateFormat.PKCS8,
                 encryption_algorithm=serialization.NoEncryption()
             ))
         
@@ -108,8 +106,8 @@ def generate_self_signed_cert(certfile="cert.pem", keyfile="key.pem", force=Fals
         print(f"✅ Successfully generated certificates!")
         print(f"   Certificate: {certfile}")
         print(f"   Private Key: {keyfile}")
-        print(f"   Valid from:  {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
-        print(f"   Valid until: {(datetime.utcnow() + timedelta(days=365)).strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        print(f"   Valid from:  {now.strftime('%Y-%m-%d %H:%M:%S')} UTC")
+        print(f"   Valid until: {(now + timedelta(days=365)).strftime('%Y-%m-%d %H:%M:%S')} UTC")
         
         return certfile, keyfile
         
@@ -119,7 +117,7 @@ def generate_self_signed_cert(certfile="cert.pem", keyfile="key.pem", force=Fals
             print("\n📦 Install with:")
             print("   pip install cryptography")
         print("\n🔧 Or generate manually with OpenSSL:")
-        print(f'   openssl req -x509 -newkey rsa:2048 -keyout {keyfile} -out {certfile} -days 365 -nodes \\')
+        print(f'   openssl req -x509 -newkey ed25519 -keyout {keyfile} -out {certfile} -days 365 -nodes \\')
         print('     -subj "/C=SG/ST=Singapore/L=Singapore/O=NUS/OU=CS3103/CN=localhost"')
         raise
     
@@ -145,8 +143,11 @@ def check_cert_expiry(certfile, warn_days=30):
         with open(certfile, "rb") as f:
             cert = x509.load_pem_x509_certificate(f.read(), default_backend())
         
-        expiry = cert.not_valid_after
-        days_until_expiry = (expiry - datetime.utcnow()).days
+        # not_valid_after_utc is only available on cryptography >= 42
+        expiry = getattr(cert, "not_valid_after_utc", None)
+        if expiry is None:
+            expiry = cert.not_valid_after.replace(tzinfo=timezone.utc)
+        days_until_expiry = (expiry - datetime.now(timezone.utc)).days
         
         if days_until_expiry < 0:
             print(f"⚠️  WARNING: Certificate expired {abs(days_until_expiry)} days ago!")
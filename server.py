@@ -10,95 +10,201 @@ Requirements satisfied:
 - Point (i): Measures latency, jitter, throughput, and packet delivery ratio
 """
 
+import argparse
 import asyncio
-import json
 import logging
+import math
+import queue
 import time
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
-from GameNetAPI import GameNetAPI
+import numpy as np
+
+from GameNetAPI import GameNetAPI, run
+from GameServerProtocol import dumps
 from generate_cert import ensure_certificates
 
 # Configure detailed logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s.%(msecs)03d | %(message)s",
-    datefmt="%H:%M:%S",
-)
+LOG_FORMAT = "%(asctime)s.%(msecs)03d | %(message)s"
+LOG_DATEFMT = "%H:%M:%S"
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt=LOG_DATEFMT)
 logger = logging.getLogger(__name__)
 
 
+def start_log_listener() -> QueueListener:
+    """Move console writes off the event loop.
+
+    The root logger's QueueHandler still merges each message with its args
+    on the emitting thread (the event loop); the QueueListener thread only
+    adds the timestamp prefix and writes to stderr, so console I/O never
+    blocks packet handling.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATEFMT))
+    log_queue = queue.SimpleQueue()
+    logging.getLogger().handlers[:] = [QueueHandler(log_queue)]
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+# Per-packet log lines, formatted lazily by the logging module
+_ARR_FMT = "[ARRIVAL]  SeqNo=%4d | Channel=%s | Timestamp=%.6fs | RTT=%7.2fms %s"
+_DEL_FMT = (
+    "[DELIVER]  SeqNo=%4d | Channel=%s | RTT=%7.2fms | "
+    "BuffDelay=%6.2fms | TotalDelay=%7.2fms | Data: %s"
+)
+
+# Separator lines for the header, stop banner and statistics report
+SEP_EQ = "=" * 100
+SEP_DASH = "-" * 100
+SEP_LOG = "  " + "-" * 95  # between groups of per-packet log lines
+
+# Weight of a new sample in the smoothed RTT (EWMA)
+RTT_EWMA_ALPHA = 0.164
+# Most recent RTT samples kept per channel for percentiles
+RTT_WINDOW = 4096
+
+
 # -------------------- Data Classes --------------------
-@dataclass
+# slots=True drops the per-instance __dict__ (Python 3.10+)
+@dataclass(slots=True)
 class PacketInfo:
     """Stores information about a received packet"""
 
     seq_no: int
-    channel: str  # "RELIABLE" or "UNRELIABLE"
-    timestamp: float  # Original send timestamp (seconds)
-    arrival_time: float  # When it arrived at receiver
-    delivery_time: float  # When delivered to application
+    channel: str  # "REL" or "UNR"
+    timestamp_ns: int  # Original send timestamp (sender wall clock)
+    arrival_ns: int  # When it arrived at receiver
+    delivery_ns: int  # When delivered to application
     rtt_ms: float
     payload: dict
     out_of_order: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ChannelMetrics:
     """Metrics for a single channel (reliable or unreliable)"""
 
     packets_received: int = 0
     packets_delivered: int = 0
     bytes_received: int = 0
-    rtts: List[float] = field(default_factory=list)
-    jitter_samples: List[float] = field(default_factory=list)
+    # Running aggregates, so memory stays O(1) however long the session runs
+    rtt_count: int = 0
+    rtt_mean: float = 0.0  # Welford running mean
+    rtt_m2: float = 0.0  # Welford sum of squared deviations
+    smoothed_rtt: float = 0.0  # EWMA, weighted toward recent samples
+    rtt_min: float = math.inf
+    rtt_max: float = -math.inf
+    jitter_count: int = 0
+    jitter_sum: float = 0.0
+    jitter_min: float = math.inf
+    jitter_max: float = -math.inf
     last_rtt: Optional[float] = None
-    start_time: Optional[float] = None
+    start_ns: Optional[int] = None  # time.monotonic_ns() of the first packet
+    duration_s: float = 0.0  # active time, set by finalize()
+    # Ring buffer of the last RTT_WINDOW samples, one float64 store each
+    rtt_window: np.ndarray = field(
+        default_factory=lambda: np.empty(RTT_WINDOW, dtype=np.float64), repr=False
+    )
+    rtt_head: int = 0  # next write index in rtt_window
     last_seq: int = 0
 
     def add_rtt(self, rtt_ms: float):
         """Add RTT sample and calculate jitter (RFC 3550)"""
-        self.rtts.append(rtt_ms)
+        self.rtt_count += 1
+        delta = rtt_ms - self.rtt_mean
+        self.rtt_mean += delta / self.rtt_count
+        self.rtt_m2 += delta * (rtt_ms - self.rtt_mean)
+        if self.rtt_count == 1:
+            self.smoothed_rtt = rtt_ms
+        else:
+            self.smoothed_rtt += RTT_EWMA_ALPHA * (rtt_ms - self.smoothed_rtt)
+        if rtt_ms < self.rtt_min:
+            self.rtt_min = rtt_ms
+        if rtt_ms > self.rtt_max:
+            self.rtt_max = rtt_ms
+        self.rtt_window[self.rtt_head] = rtt_ms
+        self.rtt_head = (self.rtt_head + 1) % RTT_WINDOW
 
         if self.last_rtt is not None:
             jitter = abs(rtt_ms - self.last_rtt)
-            self.jitter_samples.append(jitter)
+            self.jitter_count += 1
+            self.jitter_sum += jitter
+            if jitter < self.jitter_min:
+                self.jitter_min = jitter
+            if jitter > self.jitter_max:
+                self.jitter_max = jitter
 
         self.last_rtt = rtt_ms
 
     @property
     def avg_rtt(self) -> float:
         """Average RTT in milliseconds"""
-        return sum(self.rtts) / len(self.rtts) if self.rtts else 0.0
+        return self.rtt_mean
+
+    @property
+    def stddev_rtt(self) -> float:
+        """Standard deviation of RTT in milliseconds"""
+        return math.sqrt(self.rtt_m2 / self.rtt_count) if self.rtt_count else 0.0
 
     @property
     def min_rtt(self) -> float:
         """Minimum RTT in milliseconds"""
-        return min(self.rtts) if self.rtts else 0.0
+        return self.rtt_min if self.rtt_count else 0.0
 
     @property
     def max_rtt(self) -> float:
         """Maximum RTT in milliseconds"""
-        return max(self.rtts) if self.rtts else 0.0
+        return self.rtt_max if self.rtt_count else 0.0
 
     @property
     def avg_jitter(self) -> float:
         """Average jitter in milliseconds (RFC 3550)"""
-        return (
-            sum(self.jitter_samples) / len(self.jitter_samples)
-            if self.jitter_samples
-            else 0.0
-        )
+        return self.jitter_sum / self.jitter_count if self.jitter_count else 0.0
+
+    @property
+    def min_jitter(self) -> float:
+        """Minimum jitter in milliseconds"""
+        return self.jitter_min if self.jitter_count else 0.0
+
+    @property
+    def max_jitter(self) -> float:
+        """Maximum jitter in milliseconds"""
+        return self.jitter_max if self.jitter_count else 0.0
+
+    @property
+    def delivery_ratio(self) -> float:
+        """Packet delivery ratio in percent
+
+        The sender's count is not reported, so the highest in-order seq_no
+        seen stands in for the number of packets sent.
+        """
+        if not self.packets_delivered:
+            return 0.0
+        return self.packets_received / (self.last_seq + 1) * 100
+
+    def rtt_percentiles(self, percentiles=(50, 95, 99)) -> np.ndarray:
+        """RTT percentiles in ms over the last RTT_WINDOW samples"""
+        filled = min(self.rtt_count, RTT_WINDOW)
+        if not filled:
+            return np.zeros(len(percentiles))
+        return np.percentile(self.rtt_window[:filled], percentiles)
+
+    def finalize(self, now_ns: int):
+        """Fix the duration throughput is measured over, up to now_ns"""
+        if self.start_ns is not None:
+            self.duration_s = (now_ns - self.start_ns) / 1e9
 
     @property
     def throughput_bps(self) -> float:
-        """Throughput in bits per second"""
-        if self.start_time is None:
+        """Throughput in bits per second, over the finalized duration"""
+        if self.duration_s <= 0:
             return 0.0
-        duration = time.time() - self.start_time
-        return (self.bytes_received * 8) / duration if duration > 0 else 0.0
+        return (self.bytes_received * 8) / self.duration_s
 
     @property
     def throughput_kbps(self) -> float:
@@ -127,6 +233,8 @@ class ReceiverApplication:
         port: int = 4433,
         certfile: str = "cert.pem",
         keyfile: str = "key.pem",
+        quiet: bool = False,
+        metrics_enabled: bool = True,
     ):
         """
         Initialize receiver application
@@ -136,11 +244,16 @@ class ReceiverApplication:
             port: Server port number
             certfile: Path to SSL certificate
             keyfile: Path to SSL private key
+            quiet: Only accumulate metrics, skip per-packet logs
+            metrics_enabled: Track metrics and log packets; if False, only
+                ACK unreliable packets (production mode, no statistics report)
         """
         self.host = host
         self.port = port
         self.certfile = certfile
         self.keyfile = keyfile
+        self.quiet = quiet
+        self.metrics_enabled = metrics_enabled
 
         # Ensure certificates exist before initializing API
         logger.info("Checking SSL certificates...")
@@ -156,19 +269,23 @@ class ReceiverApplication:
         )
 
         # Metrics tracking
-        self.metrics = {"RELIABLE": ChannelMetrics(), "UNRELIABLE": ChannelMetrics()}
-
-        # Packet tracking
-        self.delivered_packets: List[PacketInfo] = []
-        self.packet_arrival_times: Dict[int, float] = {}
-        self.packet_send_times: Dict[int, float] = {}
+        self.metrics_rel = ChannelMetrics()
+        self.metrics_unr = ChannelMetrics()
 
         # Overall statistics
-        self.start_time: Optional[float] = None
+        self.start_ns: Optional[int] = None  # time.monotonic_ns() at start()
         self.total_arrivals: int = 0
+        self.out_of_order_total: int = 0
+        self.in_order_total: int = 0
+
+        # ACK sent back for unreliable packets, reused since send_packet
+        # serializes it before returning. GameServerProtocol ACKs reliable
+        # packets itself as soon as they arrive
+        self._ack: dict = {"ack": "received", "seq_echo": 0}
 
         # Control flags
         self.running: bool = False
+        self._stop_event: Optional[asyncio.Event] = None  # set by stop()
 
         # Display configuration
         self.log_separator_interval: int = 10  # Print separator every N packets
@@ -181,25 +298,25 @@ class ReceiverApplication:
 
     def print_startup_header(self):
         """Print formatted startup header"""
-        print("\n" + "=" * 100)
+        print("\n" + SEP_EQ)
         print("H-QUIC RECEIVER APPLICATION (SERVER MODE)")
-        print("=" * 100)
+        print(SEP_EQ)
         print(f"Started:        {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"Listening on:   {self.host}:{self.port}")
         print(f"Certificate:    {self.certfile}")
         print(f"Private Key:    {self.keyfile}")
-        print("=" * 100)
+        print(SEP_EQ)
         print("\nLog Format:")
         print("  [ARRIVAL]  - Packet arrives from network")
-        print("  [DELIVER]  - Packet delivered to application (after reordering)")
+        print("  [DELIVER]  - Packet delivered to application, with its payload")
         print("  [OUT-ORDER] - Packet received out of order")
-        print("  [APP-DATA] - Application displays packet payload")
-        print("=" * 100 + "\n")
+        print(SEP_EQ + "\n")
 
     async def start(self):
         """Start the receiver server"""
-        self.start_time = time.time()
+        self.start_ns = time.monotonic_ns()
         self.running = True
+        self._stop_event = asyncio.Event()
 
         logger.info("Starting H-QUIC receiver server...")
 
@@ -209,66 +326,85 @@ class ReceiverApplication:
         logger.info(f"Server started - Listening on {self.host}:{self.port}\n")
         logger.info("Waiting for packets from clients...\n")
 
-    async def on_message(self, data: dict, reliable: bool, proto: GameNetAPI):
-        """Callback for received messages - updates metrics"""
+    async def on_message(
+        self, data: dict, reliable: bool, proto: GameNetAPI, wire_bytes: int
+    ):
+        """Callback for received messages - updates metrics
+
+        wire_bytes is the size of the packet as received by the protocol,
+        so the payload does not need to be serialized again to count it.
+        """
+        if not self.metrics_enabled:
+            # production mode: nobody reads the report, just ACK
+            if not reliable:
+                response = self._ack
+                response["seq_echo"] = data["seq_no"]
+                proto.send_packet(response, reliable=False)
+            return
+
         # Extract packet fields
         seq_no = data["seq_no"]
-        timestamp = data["timestamp"] / 1000.0  # Convert ms to seconds
+        timestamp_ns = data["timestamp"] * 1_000_000  # Convert ms to ns
         payload = data["payload"]
 
-        arrival_time = time.time()
+        # Arrival time and RTT are measured once by the protocol on receipt.
+        # Both stay on the wall clock, as they are compared with the sender's
+        # timestamp; local durations use time.monotonic_ns()
+        arrival_ns = data["arrival_ns"]
+        rtt_ms = data["rtt_ms"]
         self.total_arrivals += 1
 
         # Determine channel
-        channel = "RELIABLE" if reliable else "UNRELIABLE"
-        metrics = self.metrics[channel]
+        if reliable:
+            metrics = self.metrics_rel
+            channel_str = "REL"
+        else:
+            metrics = self.metrics_unr
+            channel_str = "UNR"
 
         # Initialize channel start time
-        if metrics.start_time is None:
-            metrics.start_time = arrival_time
-
-        # Store timing information
-        self.packet_arrival_times[seq_no] = arrival_time
-        self.packet_send_times[seq_no] = timestamp
-
-        # Calculate RTT (one-way latency approximation)
-        rtt_ms = (arrival_time - timestamp) * 1000
+        if metrics.start_ns is None:
+            metrics.start_ns = time.monotonic_ns()
 
         # Add RTT to metrics (also calculates jitter)
         metrics.add_rtt(rtt_ms)
 
         # Update receive counters
         metrics.packets_received += 1
-        payload_bytes = len(json.dumps(payload).encode())
-        metrics.bytes_received += payload_bytes
+        metrics.bytes_received += wire_bytes
 
         # Detect out-of-order delivery
         out_of_order = seq_no <= metrics.last_seq and metrics.last_seq >= 0
-        if not out_of_order:
+        if out_of_order:
+            self.out_of_order_total += 1
+        else:
+            self.in_order_total += 1
             metrics.last_seq = seq_no
 
-        response = {
-            "ack": "received",
-            "seq_echo": seq_no,
-            "payload_echo": payload,
-        }
-        await proto.send_packet(response, reliable=reliable)    
+        # send_packet only queues the ACK on the connection, the actual
+        # transmit is deferred to the end of the loop iteration
+        if not reliable:
+            response = self._ack
+            response["seq_echo"] = seq_no
+            proto.send_packet(response, reliable=False)
 
         # Log packet arrival
-        self.log_packet_arrival(
-            seq_no=seq_no,
-            channel=channel,
-            timestamp=timestamp,
-            rtt_ms=rtt_ms,
-            out_of_order=out_of_order,
-        )
+        if not self.quiet:
+            self.log_packet_arrival(
+                seq_no=seq_no,
+                channel_str=channel_str,
+                timestamp_ns=timestamp_ns,
+                rtt_ms=rtt_ms,
+                out_of_order=out_of_order,
+            )
 
         # Deliver packet to application
         await self.deliver_packet(
             seq_no=seq_no,
-            channel=channel,
-            timestamp=timestamp,
-            arrival_time=arrival_time,
+            channel_str=channel_str,
+            metrics=metrics,
+            timestamp_ns=timestamp_ns,
+            arrival_ns=arrival_ns,
             rtt_ms=rtt_ms,
             payload=payload,
             out_of_order=out_of_order,
@@ -276,17 +412,13 @@ class ReceiverApplication:
 
     async def receive_loop(self):
         """
-        Main receive loop - receives and processes packets
+        Main receive loop - keeps the server alive until stop()
 
-        This is the core loop that:
-        1. Receives packets from GameNetAPI
-        2. Processes them based on channel type
-        3. Tracks metrics
-        4. Displays logs
+        Packets are not pulled here: GameNetAPI calls on_message for each
+        one, which tracks metrics and displays logs.
         """
         try:
-            while self.running:
-                await asyncio.sleep(0.1)  # Prevent 100% CPU usage in loop
+            await self._stop_event.wait()
 
         except KeyboardInterrupt:
             logger.info("\nInterrupted by user (Ctrl+C)")
@@ -295,74 +427,11 @@ class ReceiverApplication:
         except Exception as e:
             logger.error(f"Error in receive loop: {e}", exc_info=True)
 
-    async def process_packet(
-        self, seq_no: int, timestamp: float, payload: dict, reliable: bool
-    ):
-        """
-        Process a received packet
-
-        Args:
-            seq_no: Packet sequence number
-            timestamp: Original send timestamp (seconds)
-            payload: Packet payload data
-            reliable: True if RELIABLE channel, False if UNRELIABLE
-        """
-        arrival_time = time.time()
-        self.total_arrivals += 1
-
-        # Determine channel
-        channel = "RELIABLE" if reliable else "UNRELIABLE"
-        metrics = self.metrics[channel]
-
-        # Initialize channel start time
-        if metrics.start_time is None:
-            metrics.start_time = arrival_time
-
-        # Store timing information
-        self.packet_arrival_times[seq_no] = arrival_time
-        self.packet_send_times[seq_no] = timestamp
-
-        # Calculate RTT (one-way latency approximation)
-        rtt_ms = (arrival_time - timestamp) * 1000
-
-        # Add RTT to metrics (also calculates jitter)
-        metrics.add_rtt(rtt_ms)
-
-        # Update receive counters
-        metrics.packets_received += 1
-        payload_bytes = len(json.dumps(payload).encode())
-        metrics.bytes_received += payload_bytes
-
-        # Detect out-of-order delivery
-        out_of_order = seq_no <= metrics.last_seq and metrics.last_seq >= 0
-        if not out_of_order:
-            metrics.last_seq = seq_no
-
-        # Log packet arrival
-        self.log_packet_arrival(
-            seq_no=seq_no,
-            channel=channel,
-            timestamp=timestamp,
-            rtt_ms=rtt_ms,
-            out_of_order=out_of_order,
-        )
-
-        # Deliver packet to application
-        await self.deliver_packet(
-            seq_no=seq_no,
-            channel=channel,
-            timestamp=timestamp,
-            arrival_time=arrival_time,
-            rtt_ms=rtt_ms,
-            payload=payload,
-            out_of_order=out_of_order,
-        )
-
     def log_packet_arrival(
         self,
         seq_no: int,
-        channel: str,
-        timestamp: float,
+        channel_str: str,
+        timestamp_ns: int,
         rtt_ms: float,
         out_of_order: bool,
     ):
@@ -373,31 +442,20 @@ class ReceiverApplication:
         ChannelType, Timestamp, packet arrivals, and RTT
         """
         # Build status indicators
-        indicators = []
-        if out_of_order:
-            indicators.append("[OUT-OF-ORDER]")
+        status = "[OUT-OF-ORDER]" if out_of_order else ""
 
-        status = " ".join(indicators) if indicators else ""
-
-        # Format channel string
-        channel_str = "REL" if channel == "RELIABLE" else "UNR"
-
-        # Log arrival
+        # Log arrival, the message is only built if INFO is enabled
         logger.info(
-            f"[ARRIVAL]  "
-            f"SeqNo={seq_no:4d} | "
-            f"Channel={channel_str} | "
-            f"Timestamp={timestamp:.6f}s | "
-            f"RTT={rtt_ms:7.2f}ms "
-            f"{status}"
+            _ARR_FMT, seq_no, channel_str, timestamp_ns / 1e9, rtt_ms, status
         )
 
     async def deliver_packet(
         self,
         seq_no: int,
-        channel: str,
-        timestamp: float,
-        arrival_time: float,
+        channel_str: str,
+        metrics: ChannelMetrics,
+        timestamp_ns: int,
+        arrival_ns: int,
         rtt_ms: float,
         payload: dict,
         out_of_order: bool,
@@ -408,107 +466,103 @@ class ReceiverApplication:
         This simulates the application receiving and processing the packet.
         In a real game, this would update game state, render graphics, etc.
         """
-        delivery_time = time.time()
+        delivery_ns = time.time_ns()
 
         # Calculate buffering delay
-        buffering_delay_ms = (delivery_time - arrival_time) * 1000
-        total_delay_ms = (delivery_time - timestamp) * 1000
+        buffering_delay_ms = (delivery_ns - arrival_ns) / 1_000_000
+        total_delay_ms = (delivery_ns - timestamp_ns) / 1_000_000
 
         # Update metrics
-        metrics = self.metrics[channel]
         metrics.packets_delivered += 1
 
-        # Store packet info
-        packet_info = PacketInfo(
-            seq_no=seq_no,
-            channel=channel,
-            timestamp=timestamp,
-            arrival_time=arrival_time,
-            delivery_time=delivery_time,
-            rtt_ms=rtt_ms,
-            payload=payload,
-            out_of_order=out_of_order,
-        )
-        self.delivered_packets.append(packet_info)
-
-        # Log delivery
+        # Full per-packet record, only built when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            packet_info = PacketInfo(
+                seq_no=seq_no,
+                channel=channel_str,
+                timestamp_ns=timestamp_ns,
+                arrival_ns=arrival_ns,
+                delivery_ns=delivery_ns,
+                rtt_ms=rtt_ms,
+                payload=payload,
+                out_of_order=out_of_order,
+            )
+            logger.debug("[PACKET]   %s", packet_info)
+
+        if self.quiet or not logger.isEnabledFor(logging.INFO):
+            return
+
+        # Log delivery and application data on one line
         self.log_packet_delivery(
             seq_no=seq_no,
-            channel=channel,
+            channel_str=channel_str,
             rtt_ms=rtt_ms,
             buffering_delay_ms=buffering_delay_ms,
             total_delay_ms=total_delay_ms,
+            payload=payload,
         )
 
-        # Display application data
-        self.display_packet_data(seq_no, channel, payload)
-
         # Print separator for readability
         if seq_no > 0 and seq_no % self.log_separator_interval == 0:
-            logger.info("  " + "-" * 95)
+            logger.info(SEP_LOG)
 
     def log_packet_delivery(
         self,
         seq_no: int,
-        channel: str,
+        channel_str: str,
         rtt_ms: float,
         buffering_delay_ms: float,
         total_delay_ms: float,
+        payload: dict,
     ):
-        """Log packet delivery to application"""
-        channel_str = "REL" if channel == "RELIABLE" else "UNR"
-
-        logger.info(
-            f"[DELIVER]  "
-            f"SeqNo={seq_no:4d} | "
-            f"Channel={channel_str} | "
-            f"RTT={rtt_ms:7.2f}ms | "
-            f"BuffDelay={buffering_delay_ms:6.2f}ms | "
-            f"TotalDelay={total_delay_ms:7.2f}ms | "
-        )
-
-    def display_packet_data(self, seq_no: int, channel: str, payload: dict):
         """
-        Display packet payload data (simulates application usage)
+        Log packet delivery together with the payload the application sees
 
-        In a real game, this would be:
+        In a real game, the payload would be:
         - Player position updates
         - Game state changes
         - Chat messages
         - etc.
         """
-        channel_str = "REL" if channel == "RELIABLE" else "UNR"
-
-        # Format payload for display
-        payload_str = json.dumps(payload)
-        if len(payload_str) > 70:
-            payload_str = payload_str[:67] + "..."
+        # Format payload for display, truncating the encoded bytes so only
+        # the shown part is decoded (a split UTF-8 character is dropped)
+        raw = dumps(payload)
+        if len(raw) > 70:
+            payload_str = raw[:67].decode(errors="ignore") + "..."
+        else:
+            payload_str = raw.decode()
 
         logger.info(
-            f"[APP-DATA] "
-            f"SeqNo={seq_no:4d} | "
-            f"Channel={channel_str} | "
-            f"Data: {payload_str}"
+            _DEL_FMT,
+            seq_no,
+            channel_str,
+            rtt_ms,
+            buffering_delay_ms,
+            total_delay_ms,
+            payload_str,
         )
 
     async def stop(self):
         """Stop the receiver and print final statistics"""
         self.running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
 
-        logger.info("\n" + "=" * 100)
+        logger.info("\n" + SEP_EQ)
         logger.info("STOPPING RECEIVER APPLICATION")
-        logger.info("=" * 100 + "\n")
+        logger.info(SEP_EQ + "\n")
 
         # Print comprehensive statistics
-        self.print_statistics()
+        if self.metrics_enabled:
+            self.print_statistics()
 
         # Close API connection
         await self.api.close()
         await asyncio.sleep(0.1)
 
-        logger.info("\n" + "=" * 100)
+        logger.info("\n" + SEP_EQ)
         logger.info("Receiver stopped successfully")
-        logger.info("=" * 100 + "\n")
+        logger.info(SEP_EQ + "\n")
 
     def print_statistics(self):
         """
@@ -517,21 +571,25 @@ class ReceiverApplication:
         Satisfies assignment requirement (i): Measure performance metrics
         including latency, jitter, throughput, and packet delivery ratio
         """
-        runtime = time.time() - self.start_time if self.start_time else 0
+        # read the clock once, runtime and every channel share it
+        now_ns = time.monotonic_ns()
+        runtime = (now_ns - self.start_ns) / 1e9 if self.start_ns else 0
 
-        print("=" * 100)
+        print(SEP_EQ)
         print("H-QUIC RECEIVER STATISTICS")
-        print("=" * 100)
+        print(SEP_EQ)
 
         # Overall statistics
         print(f"\n{'OVERALL STATISTICS':^100}")
-        print("-" * 100)
+        print(SEP_DASH)
         print(f"  Total Runtime:              {runtime:.2f} seconds")
         print(f"  Total Packets Received:     {self.total_arrivals}")
-        print(f"  Total Packets Delivered:    {len(self.delivered_packets)}")
+        channels = (("RELIABLE", self.metrics_rel), ("UNRELIABLE", self.metrics_unr))
+        total_delivered = sum(m.packets_delivered for _, m in channels)
+        print(f"  Total Packets Delivered:    {total_delivered}")
 
         # Calculate total throughput
-        total_bytes = sum(m.bytes_received for m in self.metrics.values())
+        total_bytes = sum(m.bytes_received for _, m in channels)
         total_throughput_kbps = (
             (total_bytes * 8) / (runtime * 1000) if runtime > 0 else 0
         )
@@ -540,68 +598,65 @@ class ReceiverApplication:
 
         # Channel-specific statistics
         print(f"\n{'CHANNEL-SPECIFIC STATISTICS':^100}")
-        print("-" * 100)
-
-        for channel_name in ["RELIABLE", "UNRELIABLE"]:
-            metrics = self.metrics[channel_name]
-
-            print(f"\n  {channel_name} Channel:")
-            print(f"    Packets Received:         {metrics.packets_received}")
-            print(f"    Packets Delivered:        {metrics.packets_delivered}")
-            print(f"    Bytes Received:           {metrics.bytes_received:,} bytes")
-
-            if metrics.rtts:
-                print(f"\n    Latency (RTT):")
-                print(f"      Average:                {metrics.avg_rtt:.2f} ms")
-                print(f"      Minimum:                {metrics.min_rtt:.2f} ms")
-                print(f"      Maximum:                {metrics.max_rtt:.2f} ms")
-
-                print(f"\n    Jitter (RFC 3550):")
-                print(f"      Average:                {metrics.avg_jitter:.2f} ms")
-                if metrics.jitter_samples:
-                    print(
-                        f"      Minimum:                {min(metrics.jitter_samples):.2f} ms"
-                    )
-                    print(
-                        f"      Maximum:                {max(metrics.jitter_samples):.2f} ms"
-                    )
-
-                print(f"\n    Throughput:")
-                print(
-                    f"      Rate:                   {metrics.throughput_kbps:.2f} Kbps"
-                )
-                print(
-                    f"      Rate:                   {metrics.throughput_kbps/8:.2f} KBps"
-                )
-
-                # Calculate PDR (assuming we sent same number as received for demo)
-                # In production, sender would send this information
-                pdr = (
-                    (metrics.packets_received / (metrics.last_seq + 1) * 100)
-                    if metrics.packets_delivered > 0
-                    else 0
-                )
-                print(f"      Packet Delivery Ratio:                    {pdr:.2f}%")
+        print(SEP_DASH)
+
+        for channel_name, metrics in channels:
+            metrics.finalize(now_ns)
+            self._print_channel(channel_name, metrics)
 
         # Out-of-order statistics
-        out_of_order_count = sum(1 for p in self.delivered_packets if p.out_of_order)
+        out_of_order_count = self.out_of_order_total
         print(f"\n{'ORDERING STATISTICS':^100}")
-        print("-" * 100)
+        print(SEP_DASH)
         print(f"  Out-of-Order Packets:       {out_of_order_count}")
-        print(
-            f"  In-Order Packets:           {len(self.delivered_packets) - out_of_order_count}"
-        )
-
-        print("=" * 100)
+        print(f"  In-Order Packets:           {self.in_order_total}")
+
+        print(SEP_EQ)
+
+    def _print_channel(self, channel_name: str, metrics: ChannelMetrics):
+        """Print the report section of one finalized channel"""
+        print(f"\n  {channel_name} Channel:")
+        print(f"    Packets Received:         {metrics.packets_received}")
+        print(f"    Packets Delivered:        {metrics.packets_delivered}")
+        print(f"    Bytes Received:           {metrics.bytes_received:,} bytes")
+
+        if metrics.rtt_count:
+            print(f"\n    Latency (RTT):")
+            print(f"      Average:                {metrics.avg_rtt:.2f} ms")
+            print(f"      Minimum:                {metrics.min_rtt:.2f} ms")
+            print(f"      Maximum:                {metrics.max_rtt:.2f} ms")
+            print(f"      Std Deviation:          {metrics.stddev_rtt:.2f} ms")
+            print(f"      Smoothed (EWMA):        {metrics.smoothed_rtt:.2f} ms")
+            p50, p95, p99 = metrics.rtt_percentiles()
+            print(
+                f"      P50 / P95 / P99:        "
+                f"{p50:.2f} / {p95:.2f} / {p99:.2f} ms"
+            )
+
+            print(f"\n    Jitter (RFC 3550):")
+            print(f"      Average:                {metrics.avg_jitter:.2f} ms")
+            if metrics.jitter_count:
+                print(f"      Minimum:                {metrics.min_jitter:.2f} ms")
+                print(f"      Maximum:                {metrics.max_jitter:.2f} ms")
+
+            print(f"\n    Throughput:")
+            kbps = metrics.throughput_kbps
+            print(f"      Rate:                   {kbps:.2f} Kbps")
+            print(f"      Rate:                   {kbps / 8:.2f} KBps")
+
+            print(
+                f"      Packet Delivery Ratio:                    "
+                f"{metrics.delivery_ratio:.2f}%"
+            )
 
 
 # -------------------- Main Entry Point --------------------
-async def main():
+async def main(quiet: bool = False, metrics_enabled: bool = True):
     """
     Main entry point for H-QUIC receiver application
 
     Usage:
-        python server.py
+        python server.py [--quiet] [--no-metrics]
     """
     # Configuration
     HOST = "localhost"
@@ -611,7 +666,12 @@ async def main():
 
     # Create receiver application
     receiver = ReceiverApplication(
-        host=HOST, port=PORT, certfile=CERTFILE, keyfile=KEYFILE
+        host=HOST,
+        port=PORT,
+        certfile=CERTFILE,
+        keyfile=KEYFILE,
+        quiet=quiet,
+        metrics_enabled=metrics_enabled,
     )
 
     try:
@@ -636,12 +696,31 @@ if __name__ == "__main__":
 
     Example:
         python server.py
+        python server.py --quiet
+        python server.py --no-metrics
     """
+    parser = argparse.ArgumentParser(description="H-QUIC receiver (server mode)")
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="only accumulate metrics, skip per-packet logs",
+    )
+    parser.add_argument(
+        "--no-metrics",
+        dest="metrics_enabled",
+        action="store_false",
+        help="only ACK packets, no per-packet logs or statistics report",
+    )
+    args = parser.parse_args()
+    listener = start_log_listener()
+
     print("CS3103 Assignment 4 - H-QUIC Protocol")
     print("Adaptive Hybrid Transport Protocol for Games")
     try:
-        asyncio.run(main())
+        run(main(quiet=args.quiet, metrics_enabled=args.metrics_enabled))
     except KeyboardInterrupt:
         print("\nEnd Connection")
     except Exception as e:
         logger.error(f"\nUnexpected error: {e}", exc_info=True)
+    finally:
+        listener.stop()